@@ -1,4 +1,3 @@
-from aimacode.logic import PropKB
 from aimacode.planning import Action
 from aimacode.search import (
     Node, breadth_first_search, astar_search,
@@ -15,8 +14,9 @@ from run_search import run_search
 
 class HaveCakeProblem(Problem):
     def __init__(self, initial: FluentState, goal: list):
-        self.state_map = initial.pos + initial.neg
+        self.state_map = tuple(initial.pos + initial.neg)
         Problem.__init__(self, encode_state(initial, self.state_map), goal=goal)
+        self._goal_set = frozenset(goal)
         self.actions_list = self.get_actions()
 
     def get_actions(self):
@@ -34,48 +34,31 @@ class HaveCakeProblem(Problem):
         bake_action = Action(expr("Bake(Cake)"),
                              [precond_pos, precond_neg],
                              [effect_add, effect_rem])
-        return [eat_action, bake_action]
+        actions = [eat_action, bake_action]
+        # precondition and effect sets are built once here rather than per search step
+        for action in actions:
+            action._pp = frozenset(action.precond_pos)
+            action._pn = frozenset(action.precond_neg)
+            action._ea = frozenset(action.effect_add)
+            action._er = frozenset(action.effect_rem)
+        return actions
 
     def actions(self, state: str) -> list:  # of Action
         possible_actions = []
-        kb = PropKB()
-        kb.tell(decode_state(state, self.state_map).pos_sentence())
+        pos = set(decode_state(state, self.state_map).pos)
         for action in self.actions_list:
-            is_possible = True
-            for clause in action.precond_pos:
-                if clause not in kb.clauses:
-                    is_possible = False
-            for clause in action.precond_neg:
-                if clause in kb.clauses:
-                    is_possible = False
-            if is_possible:
+            if action._pp <= pos and pos.isdisjoint(action._pn):
                 possible_actions.append(action)
         return possible_actions
 
     def result(self, state: str, action: Action):
-        new_state = FluentState([], [])
         old_state = decode_state(state, self.state_map)
-        for fluent in old_state.pos:
-            if fluent not in action.effect_rem:
-                new_state.pos.append(fluent)
-        for fluent in action.effect_add:
-            if fluent not in new_state.pos:
-                new_state.pos.append(fluent)
-        for fluent in old_state.neg:
-            if fluent not in action.effect_add:
-                new_state.neg.append(fluent)
-        for fluent in action.effect_rem:
-            if fluent not in new_state.neg:
-                new_state.neg.append(fluent)
-        return encode_state(new_state, self.state_map)
+        pos = set(old_state.pos).difference(action._er).union(action._ea)
+        neg = set(old_state.neg).difference(action._ea).union(action._er)
+        return encode_state(FluentState(list(pos), list(neg)), self.state_map)
 
     def goal_test(self, state: str) -> bool:
-        kb = PropKB()
-        kb.tell(decode_state(state, self.state_map).pos_sentence())
-        for clause in self.goal:
-            if clause not in kb.clauses:
-                return False
-        return True
+        return self._goal_set.issubset(decode_state(state, self.state_map).pos)
 
     def h_1(self, node: Node):
         # note that this is not a true heuristic
@@ -34,32 +34,35 @@ def conjunctive_sentence(pos_list, neg_list):
     return associate('&', clauses)
 
 
-def encode_state(fs: FluentState, fluent_map: list) -> str:
+def encode_state(fs: FluentState, fluent_map: tuple) -> str:
     """ encode fluents to a string of T/F using mapping
 
     :param fs: FluentState object
-    :param fluent_map: ordered list of possible fluents for the problem
+    :param fluent_map: ordered tuple of possible fluents for the problem
     :return: str eg. "TFFTFT" string of mapped positive and negative fluents
     """
-    state_tf = []
-    for fluent in fluent_map:
-        if fluent in fs.pos:
-            state_tf.append('T')
-        else:
-            state_tf.append('F')
-    return "".join(state_tf)
+    pos = set(fs.pos)
+    return "".join(['T' if fluent in pos else 'F' for fluent in fluent_map])
 
 
-def decode_state(state: str, fluent_map: list) -> FluentState:
-    """ decode string of T/F as fluent per mapping
+def decode_state(state, fluent_map: tuple) -> FluentState:
+    """ decode string of T/F (or int bitmask) as fluent per mapping
 
     :param state: str eg. "TFFTFT" string of mapped positive and negative fluents
-    :param fluent_map: ordered list of possible fluents for the problem
+        or int eg. 0b101001 with bit i set when fluent_map[i] is positive
+    :param fluent_map: ordered tuple of possible fluents for the problem
     :return: fs: FluentState object
 
-    lengths of state string and fluent_map list must be the same
+    lengths of state string and fluent_map tuple must be the same
     """
     fs = FluentState([], [])
+    if isinstance(state, int):
+        for idx, fluent in enumerate(fluent_map):
+            if state >> idx & 1:
+                fs.pos.append(fluent)
+            else:
+                fs.neg.append(fluent)
+        return fs
     for idx, char in enumerate(state):
         if char == 'T':
             fs.pos.append(fluent_map[idx])
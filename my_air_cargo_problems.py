@@ -1,14 +1,62 @@
-from aimacode.logic import PropKB
+from itertools import permutations, product
+
 from aimacode.planning import Action
 from aimacode.search import (
     Node, Problem,
 )
-from aimacode.utils import expr
+from aimacode.utils import Expr, Symbol, expr
 from lp_utils import (
-    FluentState, encode_state, decode_state,
+    FluentState,
 )
 from my_planning_graph import PlanningGraph
 
+__all__ = [
+    'AirCargoProblem', 'air_cargo_p1', 'air_cargo_p2', 'air_cargo_p3',
+    'bin_rel', 'ternary_rel', 'generate_propositions',
+]
+
+# ground actions shared between problems over the same cargos, planes and airports
+_GROUND_CACHE = {}
+
+try:
+    _popcount = int.bit_count  # Python 3.10+
+except AttributeError:
+    def _popcount(mask: int) -> int:
+        return bin(mask).count('1')
+
+
+def bin_rel(relation: str, a, b):
+    ''' binary relation literal, e.g. bin_rel('At', 'C1', 'SFO') -> At(C1, SFO)
+
+    Builds the Expr directly; equal to expr('At(C1, SFO)') without running the parser.
+
+    :return: expr
+    '''
+    return Expr(relation, Symbol(a), Symbol(b))
+
+
+def ternary_rel(relation: str, a, b, c):
+    ''' ternary relation literal, e.g. ternary_rel('Fly', 'P1', 'SFO', 'JFK') -> Fly(P1, SFO, JFK)
+
+    :return: expr
+    '''
+    return Expr(relation, Symbol(a), Symbol(b), Symbol(c))
+
+
+def generate_propositions(relation: str, pairs, all_obj2):
+    ''' positive and negative fluents of a binary relation that holds for exactly one obj2 per obj1
+
+    e.g. generate_propositions('At', [('C1', 'SFO')], ['SFO', 'JFK']) -> [At(C1, SFO)], [At(C1, JFK)]
+
+    :param relation: str name of the relation
+    :param pairs: list of (obj1, obj2) tuples for which the relation holds
+    :param all_obj2: list of every possible obj2
+    :return: (list of expr, list of expr) positive and negative fluents
+    '''
+    pos = [bin_rel(relation, o1, o2) for o1, o2 in pairs]
+    neg = [bin_rel(relation, o1, o2) for o1, at in pairs for o2 in all_obj2 if o2 != at]
+    return pos, neg
+
 
 class AirCargoProblem(Problem):
     def __init__(self, cargos, planes, airports, initial: FluentState, goal: list):
@@ -25,13 +73,47 @@ class AirCargoProblem(Problem):
         :param goal: list of expr
             literal fluents required for goal test
         """
-        self.state_map = initial.pos + initial.neg
-        self.initial_state_TF = encode_state(initial, self.state_map)
-        Problem.__init__(self, self.initial_state_TF, goal=goal)
+        self.state_map = tuple(initial.pos + initial.neg)
+        self.index = {fluent: i for i, fluent in enumerate(self.state_map)}
+        Problem.__init__(self, self.fluent_mask(initial.pos), goal=goal)
         self.cargos = cargos
         self.planes = planes
         self.airports = airports
         self.actions_list = self.get_actions()
+        self.goal_mask = self.fluent_mask(goal)
+        # parallel arrays of bitmasks, one entry per action in actions_list;
+        # care_masks holds every fluent an action has a precondition on, so an
+        # action applies when the state matches pos_masks on those bits
+        self.pos_masks = tuple(self.fluent_mask(a.precond_pos) for a in self.actions_list)
+        self.care_masks = tuple(pos | self.fluent_mask(a.precond_neg)
+                                for a, pos in zip(self.actions_list, self.pos_masks))
+        self.add_masks = tuple(self.fluent_mask(a.effect_add) for a in self.actions_list)
+        self.rem_masks = tuple(self.fluent_mask(a.effect_rem) for a in self.actions_list)
+        self.action_ids = {(a.name, a.args): i for i, a in enumerate(self.actions_list)}
+        # distinct goal fluents each action can add, for the ignore-preconditions relaxation
+        self._goal_adds = tuple({add & self.goal_mask for add in self.add_masks} - {0})
+        self._goal_addable = 0
+        for add in self._goal_adds:
+            self._goal_addable |= add
+        # when no action adds more than one goal, the cover is one action per addable goal
+        self._unit_goal_adds = all(_popcount(add) == 1 for add in self._goal_adds)
+        # search revisits states often; applicable actions are cached per state
+        self._actions_cache = {}
+
+    def fluent_mask(self, fluents) -> int:
+        ''' encode a collection of fluents as an int with one bit set per fluent
+
+        The bit for each fluent is its position in `state_map`; states of this
+        problem are represented the same way, with a bit set for every positive
+        fluent.
+
+        :param fluents: iterable of expr
+        :return: int bitmask
+        '''
+        mask = 0
+        for fluent in fluents:
+            mask |= 1 << self.index[fluent]
+        return mask
 
     def get_actions(self):
         '''
@@ -39,6 +121,8 @@ class AirCargoProblem(Problem):
         domain action schema and turns them into complete Action objects as defined in the
         aimacode.planning module. It is computationally expensive to call this method directly;
         however, it is called in the constructor and the results cached in the `actions_list` property.
+        Ground actions are also cached at module level, so problems built over the same cargos,
+        planes and airports share them.
 
         Returns:
         ----------
@@ -46,7 +130,6 @@ class AirCargoProblem(Problem):
             list of Action objects
         '''
 
-        # TODO create concrete Action objects based on the domain action schema for: Load, Unload, and Fly
         # concrete actions definition: specific literal action that does not include variables as with the schema
         # for example, the action schema 'Load(c, p, a)' can represent the concrete actions 'Load(C1, P1, SFO)'
         # or 'Load(C2, P2, JFK)'.  The actions for the planning problem must be concrete because the problems in
@@ -58,7 +141,18 @@ class AirCargoProblem(Problem):
             :return: list of Action objects
             '''
             loads = []
-            # TODO create all load ground actions from the domain Load action
+            for c, p, a in product(self.cargos, self.planes, self.airports):
+                at_ca = bin_rel('At', c, a)
+                precond_pos = [at_ca,
+                               bin_rel('At', p, a),
+                               ]
+                precond_neg = []
+                effect_add = [bin_rel('In', c, p)]
+                effect_rem = [at_ca]
+                load = Action(ternary_rel('Load', c, p, a),
+                              [precond_pos, precond_neg],
+                              [effect_add, effect_rem])
+                loads.append(load)
             return loads
 
         def unload_actions():
@@ -67,7 +161,18 @@ class AirCargoProblem(Problem):
             :return: list of Action objects
             '''
             unloads = []
-            # TODO create all Unload ground actions from the domain Unload action
+            for c, p, a in product(self.cargos, self.planes, self.airports):
+                in_cp = bin_rel('In', c, p)
+                precond_pos = [in_cp,
+                               bin_rel('At', p, a),
+                               ]
+                precond_neg = []
+                effect_add = [bin_rel('At', c, a)]
+                effect_rem = [in_cp]
+                unload = Action(ternary_rel('Unload', c, p, a),
+                                [precond_pos, precond_neg],
+                                [effect_add, effect_rem])
+                unloads.append(unload)
             return unloads
 
         def fly_actions():
@@ -76,36 +181,42 @@ class AirCargoProblem(Problem):
             :return: list of Action objects
             '''
             flys = []
-            for fr in self.airports:
-                for to in self.airports:
-                    if fr != to:
-                        for p in self.planes:
-                            precond_pos = [expr("At({}, {})".format(p, fr)),
-                                           ]
-                            precond_neg = []
-                            effect_add = [expr("At({}, {})".format(p, to))]
-                            effect_rem = [expr("At({}, {})".format(p, fr))]
-                            fly = Action(expr("Fly({}, {}, {})".format(p, fr, to)),
-                                         [precond_pos, precond_neg],
-                                         [effect_add, effect_rem])
-                            flys.append(fly)
+            at_pa = {(p, a): bin_rel('At', p, a) for p in self.planes for a in self.airports}
+            for fr, to in permutations(self.airports, 2):
+                for p in self.planes:
+                    precond_pos = [at_pa[p, fr],
+                                   ]
+                    precond_neg = []
+                    effect_add = [at_pa[p, to]]
+                    effect_rem = [at_pa[p, fr]]
+                    fly = Action(ternary_rel('Fly', p, fr, to),
+                                 [precond_pos, precond_neg],
+                                 [effect_add, effect_rem])
+                    flys.append(fly)
             return flys
 
-        return load_actions() + unload_actions() + fly_actions()
+        key = (tuple(sorted(self.cargos)), tuple(sorted(self.planes)), tuple(sorted(self.airports)))
+        if key not in _GROUND_CACHE:
+            _GROUND_CACHE[key] = load_actions() + unload_actions() + fly_actions()
+        return list(_GROUND_CACHE[key])
 
-    def actions(self, state: str) -> list:
+    def actions(self, state: int) -> list:
         """ Return the actions that can be executed in the given state.
 
-        :param state: str
-            state represented as T/F string of mapped fluents (state variables)
-            e.g. 'FTTTFF'
+        :param state: int
+            state represented as a bitmask of the positive fluents in state_map
+            e.g. 0b001110
         :return: list of Action objects
         """
-        # TODO implement
-        possible_actions = []
-        return possible_actions
+        possible_actions = self._actions_cache.get(state)
+        if possible_actions is None:
+            possible_actions = tuple(action for action, pos, care
+                                     in zip(self.actions_list, self.pos_masks, self.care_masks)
+                                     if not (state ^ pos) & care)
+            self._actions_cache[state] = possible_actions
+        return list(possible_actions)
 
-    def result(self, state: str, action: Action):
+    def result(self, state: int, action: Action):
         """ Return the state that results from executing the given
         action in the given state. The action must be one of
         self.actions(state).
@@ -114,22 +225,16 @@ class AirCargoProblem(Problem):
         :param action: Action applied
         :return: resulting state after action
         """
-        # TODO implement
-        new_state = FluentState([], [])
-        return encode_state(new_state, self.state_map)
+        idx = self.action_ids[(action.name, action.args)]
+        return (state | self.add_masks[idx]) & ~self.rem_masks[idx]
 
-    def goal_test(self, state: str) -> bool:
+    def goal_test(self, state: int) -> bool:
         """ Test the state to see if goal is reached
 
-        :param state: str representing state
+        :param state: int bitmask representing state
         :return: bool
         """
-        kb = PropKB()
-        kb.tell(decode_state(state, self.state_map).pos_sentence())
-        for clause in self.goal:
-            if clause not in kb.clauses:
-                return False
-        return True
+        return state & self.goal_mask == self.goal_mask
 
     def h_1(self, node: Node):
         # note that this is not a true heuristic
@@ -143,7 +248,8 @@ class AirCargoProblem(Problem):
         out from the current state in order to satisfy each individual goal
         condition.
         '''
-        # requires implemented PlanningGraph class
+        # requires implemented PlanningGraph class; the int state is decoded
+        # by PlanningGraph itself, so no string form is ever built
         pg = PlanningGraph(self, node.state)
         pg_levelsum = pg.h_levelsum()
         return pg_levelsum
@@ -154,9 +260,21 @@ class AirCargoProblem(Problem):
         carried out from the current state in order to satisfy all of the goal
         conditions by ignoring the preconditions required for an action to be
         executed.
+
+        Without preconditions this is a set cover of the unsatisfied goals by
+        the actions' add effects (Russell-Norvig Ed-3 10.2.3), solved greedily
+        by repeatedly taking the action that adds the most remaining goals.
         '''
-        # TODO implement (see Russell-Norvig Ed-3 10.2.3  or Russell-Norvig Ed-2 11.2)
+        remaining = self.goal_mask & ~node.state
+        if self._unit_goal_adds:
+            return _popcount(remaining & self._goal_addable)
         count = 0
+        while remaining:
+            covered = max((add & remaining for add in self._goal_adds), key=_popcount)
+            if not covered:
+                break
+            remaining &= ~covered
+            count += 1
         return count
 
 
@@ -186,10 +304,35 @@ def air_cargo_p1() -> AirCargoProblem:
 
 
 def air_cargo_p2() -> AirCargoProblem:
-    # TODO implement Problem 2 definition
-    pass
+    cargos = ['C1', 'C2', 'C3']
+    planes = ['P1', 'P2', 'P3']
+    airports = ['JFK', 'SFO', 'ATL']
+    cargo_pos, cargo_neg = generate_propositions(
+        'At', [('C1', 'SFO'), ('C2', 'JFK'), ('C3', 'ATL')], airports)
+    plane_pos, plane_neg = generate_propositions(
+        'At', [('P1', 'SFO'), ('P2', 'JFK'), ('P3', 'ATL')], airports)
+    in_neg = [bin_rel('In', c, p) for c in cargos for p in planes]
+    init = FluentState(cargo_pos + plane_pos, cargo_neg + plane_neg + in_neg)
+    goal = [expr('At(C1, JFK)'),
+            expr('At(C2, SFO)'),
+            expr('At(C3, SFO)'),
+            ]
+    return AirCargoProblem(cargos, planes, airports, init, goal)
 
 
 def air_cargo_p3() -> AirCargoProblem:
-    # TODO implement Problem 3 definition
-    pass
+    cargos = ['C1', 'C2', 'C3', 'C4']
+    planes = ['P1', 'P2']
+    airports = ['JFK', 'SFO', 'ATL', 'ORD']
+    cargo_pos, cargo_neg = generate_propositions(
+        'At', [('C1', 'SFO'), ('C2', 'JFK'), ('C3', 'ATL'), ('C4', 'ORD')], airports)
+    plane_pos, plane_neg = generate_propositions(
+        'At', [('P1', 'SFO'), ('P2', 'JFK')], airports)
+    in_neg = [bin_rel('In', c, p) for c in cargos for p in planes]
+    init = FluentState(cargo_pos + plane_pos, cargo_neg + plane_neg + in_neg)
+    goal = [expr('At(C1, JFK)'),
+            expr('At(C3, JFK)'),
+            expr('At(C2, SFO)'),
+            expr('At(C4, SFO)'),
+            ]
+    return AirCargoProblem(cargos, planes, airports, init, goal)
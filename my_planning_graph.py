@@ -75,7 +75,7 @@ class PgNode_s(PgNode):
         self.is_pos = is_pos
         self.literal = expr(self.symbol)
         if not self.is_pos:
-            self.literal = expr('~{}'.format(self.symbol))
+            self.literal = ~self.literal
 
     def show(self):
         '''helper print for debugging shows literal plus counts of parents, children, siblings
@@ -208,6 +208,7 @@ class PlanningGraph():
         '''
         :param problem: PlanningProblem (or subclass such as AirCargoProblem or HaveCakeProblem)
         :param state: str (will be in form TFTTFF... representing fluent states)
+            or int bitmask of positive fluents, as used by AirCargoProblem
         :param serial_planning: bool (whether or not to assume that only one action can occur at a time)
         Instance variable calculated:
             fs: FluentState
@@ -304,13 +305,19 @@ class PlanningGraph():
         :return:
             adds A nodes to the current level in self.a_levels[level]
         '''
-        # TODO add action A level to the planning graph as described in the Russell-Norvig text
-        # 1. determine what actions to add and create those PgNode_a objects
-        # 2. connect the nodes to the previous S literal level
-        # for example, the A0 level will iterate through all possible actions for the problem and add a PgNode_a to a_levels[0]
-        #   set iff all prerequisite literals for the action hold in S0.  This can be accomplished by testing
-        #   to see if a proposed PgNode_a has prenodes that are a subset of the previous S level.  Once an
-        #   action node is added, it MUST be connected to the S node instances in the appropriate s_level set.
+        # map each literal to the node instance actually in the S level, so that
+        # new A nodes are connected to those instances rather than to their prenodes
+        s_nodes = {node: node for node in self.s_levels[level]}
+        a_level = set()
+        for action in self.all_actions:
+            a_node = PgNode_a(action)
+            if all(p in s_nodes for p in a_node.prenodes):
+                for p in a_node.prenodes:
+                    s_node = s_nodes[p]
+                    a_node.parents.add(s_node)
+                    s_node.children.add(a_node)
+                a_level.add(a_node)
+        self.a_levels.append(a_level)
 
     def add_literal_level(self, level):
         ''' add an S (literal) level to the Planning Graph
@@ -321,14 +328,16 @@ class PlanningGraph():
         :return:
             adds S nodes to the current level in self.s_levels[level]
         '''
-        # TODO add literal S level to the planning graph as described in the Russell-Norvig text
-        # 1. determine what literals to add
-        # 2. connect the nodes
-        # for example, every A node in the previous level has a list of S nodes in effnodes that represent the effect
-        #   produced by the action.  These literals will all be part of the new S level.  Since we are working with sets, they
-        #   may be "added" to the set without fear of duplication.  However, it is important to then correctly create and connect
-        #   all of the new S nodes as children of all the A nodes that could produce them, and likewise add the A nodes to the
-        #   parent sets of the S nodes
+        s_nodes = {}
+        for a_node in self.a_levels[level - 1]:
+            for e in a_node.effnodes:
+                s_node = s_nodes.get(e)
+                if s_node is None:
+                    s_node = PgNode_s(e.symbol, e.is_pos)
+                    s_nodes[s_node] = s_node
+                s_node.parents.add(a_node)
+                a_node.children.add(s_node)
+        self.s_levels.append(set(s_nodes))
 
     def update_a_mutex(self, nodeset):
         ''' Determine and update sibling mutual exclusion for A-level nodes
@@ -386,8 +395,10 @@ class PlanningGraph():
         :param node_a2: PgNode_a
         :return: bool
         '''
-        # TODO test for Inconsistent Effects between nodes
-        return False
+        a1 = node_a1.action
+        a2 = node_a2.action
+        return not (set(a1.effect_add).isdisjoint(a2.effect_rem)
+                    and set(a2.effect_add).isdisjoint(a1.effect_rem))
 
     def interference_mutex(self, node_a1: PgNode_a, node_a2: PgNode_a) -> bool:
         '''
@@ -403,8 +414,12 @@ class PlanningGraph():
         :param node_a2: PgNode_a
         :return: bool
         '''
-        # TODO test for Interference between nodes
-        return False
+        a1 = node_a1.action
+        a2 = node_a2.action
+        return not (set(a1.effect_add).isdisjoint(a2.precond_neg)
+                    and set(a1.effect_rem).isdisjoint(a2.precond_pos)
+                    and set(a2.effect_add).isdisjoint(a1.precond_neg)
+                    and set(a2.effect_rem).isdisjoint(a1.precond_pos))
 
     def competing_needs_mutex(self, node_a1: PgNode_a, node_a2: PgNode_a) -> bool:
         '''
@@ -417,7 +432,10 @@ class PlanningGraph():
         :return: bool
         '''
 
-        # TODO test for Competing Needs between nodes
+        for p1 in node_a1.parents:
+            for p2 in node_a2.parents:
+                if p1.is_mutex(p2):
+                    return True
         return False
 
     def update_s_mutex(self, nodeset: set):
@@ -452,8 +470,7 @@ class PlanningGraph():
         :param node_s2: PgNode_s
         :return: bool
         '''
-        # TODO test for negation between nodes
-        return False
+        return node_s1.symbol == node_s2.symbol and node_s1.is_pos != node_s2.is_pos
 
     def inconsistent_support_mutex(self, node_s1: PgNode_s, node_s2: PgNode_s):
         '''
@@ -471,8 +488,11 @@ class PlanningGraph():
         :param node_s2: PgNode_s
         :return: bool
         '''
-        # TODO test for Inconsistent Support between nodes
-        return False
+        for a1 in node_s1.parents:
+            for a2 in node_s2.parents:
+                if not a1.is_mutex(a2):
+                    return False
+        return True
 
     def h_levelsum(self) -> int:
         '''The sum of the level costs of the individual goals (admissible if goals independent)
@@ -480,6 +500,11 @@ class PlanningGraph():
         :return: int
         '''
         level_sum = 0
-        # TODO implement
-        # for each goal in the problem, determine the level cost, then add them together
+        goals = {PgNode_s(g, True) for g in self.problem.goal}
+        for level, s_level in enumerate(self.s_levels):
+            reached = goals & s_level
+            level_sum += level * len(reached)
+            goals -= reached
+            if not goals:
+                break
         return level_sum